@@ -2,7 +2,7 @@
 
 from .playbook import Bullet, Playbook
 from .delta import DeltaOperation, DeltaBatch
-from .llm import LLMClient, DummyLLMClient, TransformersLLMClient
+from .llm import LLMClient, BatchingLLMClient, DummyLLMClient, TransformersLLMClient
 from .roles import (
     Generator,
     Reflector,
@@ -32,6 +32,7 @@ __all__ = [
     "DeltaOperation",
     "DeltaBatch",
     "LLMClient",
+    "BatchingLLMClient",
     "DummyLLMClient",
     "TransformersLLMClient",
     "Generator",
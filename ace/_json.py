@@ -0,0 +1,37 @@
+"""JSON parsing that uses orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so callers can catch one type for
+# either backend.
+JSONDecodeError = json.JSONDecodeError
+
+# orjson turns integers outside the int64/uint64 range into floats. The
+# shortest such value is -9223372036854775809 (19 digits), so leave any
+# document with a digit run that long to the stdlib parser.
+_LONG_DIGITS = re.compile(r"\d{19}")
+
+
+def loads(text: str) -> Any:
+    """
+    Parse a JSON document with the same results as ``json.loads``.
+
+    orjson handles the common case. Documents it rejects but the stdlib
+    accepts (``NaN``, ``Infinity``, lone surrogates, out-of-range floats)
+    and documents with very long numbers are parsed by ``json.loads``.
+    """
+    if orjson is not None and not _LONG_DIGITS.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
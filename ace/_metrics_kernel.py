@@ -0,0 +1,78 @@
+"""Compiled kernels for bulk MetricsCalculator computations."""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Below this size the JIT call overhead outweighs the compiled loop.
+JIT_THRESHOLD = 10_000
+
+# Above this many classes a dense confusion matrix costs more than it saves.
+DENSE_CLASS_LIMIT = 256
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _confusion_jit(labels, preds, n_classes):
+        matrix = np.zeros((n_classes, n_classes), dtype=np.int64)
+        for i in range(labels.shape[0]):
+            matrix[labels[i], preds[i]] += 1
+        return matrix
+
+else:
+    _confusion_jit = None
+
+
+def confusion_matrix(labels: np.ndarray, preds: np.ndarray, n_classes: int) -> np.ndarray:
+    """
+    Count every (label, prediction) pair in one pass.
+
+    Args:
+        labels: Ground truth codes in ``[0, n_classes)``
+        preds: Prediction codes in ``[0, n_classes)``
+        n_classes: Number of distinct class codes
+
+    Returns:
+        ``int64[n_classes, n_classes]`` matrix with ground truth on the rows
+        and predictions on the columns
+    """
+    if _confusion_jit is not None and labels.size >= JIT_THRESHOLD:
+        return _confusion_jit(labels, preds, n_classes)
+    index = labels.astype(np.intp) * n_classes
+    index += preds
+    counts = np.bincount(index, minlength=n_classes * n_classes)
+    return counts.astype(np.int64, copy=False).reshape(n_classes, n_classes)
+
+
+def class_counts(
+    labels: np.ndarray, preds: np.ndarray, n_classes: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count per-class true positives, predictions and ground truth occurrences.
+
+    Args:
+        labels: Ground truth codes in ``[0, n_classes)``
+        preds: Prediction codes in ``[0, n_classes)``
+        n_classes: Number of distinct class codes
+
+    Returns:
+        ``(true_positives, predicted, actual)``, each of length ``n_classes``
+    """
+    if n_classes <= DENSE_CLASS_LIMIT:
+        matrix = confusion_matrix(labels, preds, n_classes)
+        return matrix.diagonal(), matrix.sum(axis=0), matrix.sum(axis=1)
+    hits = labels[labels == preds]
+    return (
+        np.bincount(hits, minlength=n_classes),
+        np.bincount(preds, minlength=n_classes),
+        np.bincount(labels, minlength=n_classes),
+    )
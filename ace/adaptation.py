@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import json
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, Iterable, List, Optional, Sequence
 
@@ -12,7 +14,7 @@ from .playbook import Playbook
 from .roles import Curator, CuratorOutput, Generator, GeneratorOutput, Reflector, ReflectorOutput
 
 
-@dataclass
+@dataclass(slots=True)
 class Sample:
     """Single task instance presented to ACE."""
 
@@ -22,7 +24,7 @@ class Sample:
     metadata: Dict[str, object] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class EnvironmentResult:
     """Feedback returned by the task environment after executing the generator output."""
 
@@ -71,6 +73,10 @@ class AdapterBase:
         self.max_refinement_rounds = max_refinement_rounds
         self.reflection_window = reflection_window
         self._recent_reflections: List[str] = []
+        # Guards the playbook, the reflection window and environment.evaluate
+        # when samples are processed concurrently; LLM calls run unlocked.
+        self._lock = threading.RLock()
+        self._snapshot_playbook = False
 
     # ------------------------------------------------------------------ #
     def _reflection_context(self) -> str:
@@ -99,6 +105,15 @@ class AdapterBase:
         ]
         return "\n".join(parts)
 
+    def _playbook_view(self) -> Playbook:
+        """Return the playbook the roles should read for the next LLM call."""
+        if not self._snapshot_playbook:
+            return self.playbook
+        # Concurrent workers render prompts from a private copy so another
+        # worker's curator update cannot change the playbook mid-iteration.
+        with self._lock:
+            return self.playbook.copy()
+
     def _progress_string(self, epoch: int, total_epochs: int, step: int, total_steps: int) -> str:
         return f"epoch {epoch}/{total_epochs} · sample {step}/{total_steps}"
 
@@ -119,14 +134,17 @@ class AdapterBase:
         if hasattr(sample, "paragraph"):
             generator_kwargs["paragraph"] = sample.paragraph
             
+        with self._lock:
+            reflection_context = self._reflection_context()
         generator_output = self.generator.generate(
             question=sample.question,
             context=sample.context,
-            playbook=self.playbook,
-            reflection=self._reflection_context(),
+            playbook=self._playbook_view(),
+            reflection=reflection_context,
             **generator_kwargs,
         )
-        env_result = environment.evaluate(sample, generator_output)
+        with self._lock:
+            env_result = environment.evaluate(sample, generator_output)
         
         # Prepare reflector kwargs - pass patent-specific fields if available
         reflector_kwargs = {}
@@ -138,33 +156,43 @@ class AdapterBase:
         reflection = self.reflector.reflect(
             question=sample.question,
             generator_output=generator_output,
-            playbook=self.playbook,
+            playbook=self._playbook_view(),
             ground_truth=env_result.ground_truth,
             feedback=env_result.feedback,
             max_refinement_rounds=self.max_refinement_rounds,
             **reflector_kwargs,
         )
-        self._apply_bullet_tags(reflection)
-        self._update_recent_reflections(reflection)
+        with self._lock:
+            self._apply_bullet_tags(reflection)
+            self._update_recent_reflections(reflection)
         curator_output = self.curator.curate(
             reflection=reflection,
-            playbook=self.playbook,
+            playbook=self._playbook_view(),
             question_context=self._question_context(sample, env_result),
             progress=self._progress_string(epoch, total_epochs, step_index, total_steps),
         )
-        self.playbook.apply_delta(curator_output.delta)
+        with self._lock:
+            self.playbook.apply_delta(curator_output.delta)
+            playbook_snapshot = self.playbook.as_prompt()
         return AdapterStepResult(
             sample=sample,
             generator_output=generator_output,
             environment_result=env_result,
             reflection=reflection,
             curator_output=curator_output,
-            playbook_snapshot=self.playbook.as_prompt(),
+            playbook_snapshot=playbook_snapshot,
         )
 
 
 class OfflineAdapter(AdapterBase):
-    """Runs multi-epoch offline adaptation on a training split."""
+    """
+    Runs multi-epoch offline adaptation on a training split.
+
+    With ``max_workers > 1`` the samples of an epoch are processed on a thread
+    pool so LLM calls overlap. Results keep the input order, but playbook
+    updates are applied in completion order, so the evolved playbook can
+    differ from a sequential run.
+    """
 
     def __init__(
         self,
@@ -176,7 +204,10 @@ class OfflineAdapter(AdapterBase):
         deduplicator: Optional[Deduplicator] = None,
         max_refinement_rounds: int = 1,
         reflection_window: int = 3,
+        max_workers: int = 1,
     ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
         super().__init__(
             playbook=playbook,
             generator=generator,
@@ -186,6 +217,8 @@ class OfflineAdapter(AdapterBase):
             reflection_window=reflection_window,
         )
         self.deduplicator = deduplicator
+        self.max_workers = max_workers
+        self._snapshot_playbook = max_workers > 1
 
     def run(
         self,
@@ -195,24 +228,46 @@ class OfflineAdapter(AdapterBase):
     ) -> List[AdapterStepResult]:
         results: List[AdapterStepResult] = []
         total_steps = len(samples)
-        for epoch_idx in range(1, epochs + 1):
-            bullet_ids_this_epoch = []
-            for step_idx, sample in enumerate(samples, start=1):
-                result = self._process_sample(
-                    sample,
-                    environment,
-                    epoch=epoch_idx,
-                    total_epochs=epochs,
-                    step_index=step_idx,
-                    total_steps=total_steps,
-                )
-                results.append(result)
-                bullet_ids_this_epoch.extend(
-                    op.bullet_id for op in result.curator_output.delta.operations if op.bullet_id
-                )
-
-            if self.deduplicator:
-                self.playbook.deduplicate(self.deduplicator, bullet_ids_this_epoch)
+        executor = (
+            ThreadPoolExecutor(max_workers=self.max_workers)
+            if self.max_workers > 1
+            else None
+        )
+        try:
+            for epoch_idx in range(1, epochs + 1):
+                bullet_ids_this_epoch = []
+                step_kwargs = [
+                    dict(
+                        epoch=epoch_idx,
+                        total_epochs=epochs,
+                        step_index=step_idx,
+                        total_steps=total_steps,
+                    )
+                    for step_idx in range(1, total_steps + 1)
+                ]
+                if executor is None:
+                    epoch_results = (
+                        self._process_sample(sample, environment, **kwargs)
+                        for sample, kwargs in zip(samples, step_kwargs)
+                    )
+                else:
+                    futures = [
+                        executor.submit(self._process_sample, sample, environment, **kwargs)
+                        for sample, kwargs in zip(samples, step_kwargs)
+                    ]
+                    epoch_results = (future.result() for future in futures)
+
+                for result in epoch_results:
+                    results.append(result)
+                    bullet_ids_this_epoch.extend(
+                        op.bullet_id for op in result.curator_output.delta.operations if op.bullet_id
+                    )
+
+                if self.deduplicator:
+                    self.playbook.deduplicate(self.deduplicator, bullet_ids_this_epoch)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
         return results
 
@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import os
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
-import json
 from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Any, Deque, Dict, Optional, Union
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from . import _json
 
 try:
     from dotenv import load_dotenv
@@ -33,6 +38,10 @@ class LLMClient(ABC):
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
         """Return the model text for a given prompt."""
 
+    def complete_batch(self, prompts: Sequence[str], **kwargs: Any) -> List[LLMResponse]:
+        """Return one response per prompt; backends that can batch override this."""
+        return [self.complete(prompt, **kwargs) for prompt in prompts]
+
 
 class DummyLLMClient(LLMClient):
     """Deterministic LLM stub for testing and dry runs."""
@@ -46,9 +55,132 @@ class DummyLLMClient(LLMClient):
         self._responses.append(text)
 
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
-        if not self._responses:
-            raise RuntimeError("DummyLLMClient ran out of queued responses.")
-        return LLMResponse(text=self._responses.popleft())
+        # A single popleft() is atomic, so concurrent callers never share a response
+        try:
+            text = self._responses.popleft()
+        except IndexError:
+            raise RuntimeError("DummyLLMClient ran out of queued responses.") from None
+        return LLMResponse(text=text)
+
+
+class BatchingLLMClient(LLMClient):
+    """
+    Coalesces concurrent ``complete`` calls into ``complete_batch`` calls.
+
+    Callers block as usual. A background thread collects the requests that
+    arrive within ``flush_ms`` of each other (up to ``max_batch_size``) and
+    sends each group with identical keyword arguments to the wrapped
+    client's ``complete_batch``. Only useful when several threads share the
+    client, e.g. ``OfflineAdapter(max_workers=...)``.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        *,
+        flush_ms: float = 10.0,
+        max_batch_size: int = 16,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        super().__init__(model=client.model)
+        self.client = client
+        self.flush_ms = flush_ms
+        self.max_batch_size = max_batch_size
+        self._requests: "queue.Queue[Optional[Tuple[str, Dict[str, Any], Future]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        future: Future = Future()
+        self._ensure_worker()
+        self._requests.put((prompt, kwargs, future))
+        return future.result()
+
+    def complete_batch(self, prompts: Sequence[str], **kwargs: Any) -> List[LLMResponse]:
+        return self.client.complete_batch(prompts, **kwargs)
+
+    def close(self) -> None:
+        """Stop the background thread after the queued requests are served."""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._requests.put(None)
+            worker.join()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="BatchingLLMClient", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.flush_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            try:
+                self._dispatch(batch)
+            except Exception as exc:
+                # Never let the worker die with callers still waiting
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[Tuple[str, Dict[str, Any], Future]]) -> None:
+        # Keyword arguments may hold unhashable values, so group by equality.
+        groups: List[Tuple[Dict[str, Any], List[Tuple[str, Future]]]] = []
+        for prompt, kwargs, future in batch:
+            for group_kwargs, items in groups:
+                if _same_kwargs(group_kwargs, kwargs):
+                    items.append((prompt, future))
+                    break
+            else:
+                groups.append((kwargs, [(prompt, future)]))
+
+        for kwargs, items in groups:
+            try:
+                responses = self.client.complete_batch(
+                    [prompt for prompt, _ in items], **kwargs
+                )
+                if len(responses) != len(items):
+                    raise RuntimeError(
+                        f"complete_batch returned {len(responses)} responses for {len(items)} prompts."
+                    )
+            except Exception as exc:
+                for _, future in items:
+                    future.set_exception(exc)
+                continue
+            for (_, future), response in zip(items, responses):
+                future.set_result(response)
+
+
+def _same_kwargs(left: Dict[str, Any], right: Dict[str, Any]) -> bool:
+    """Return whether two requests can share a batch call."""
+    try:
+        return bool(left == right)
+    except Exception:
+        # Values without a usable == (e.g. NumPy arrays) get their own call
+        return False
 
 
 class TransformersLLMClient(LLMClient):
@@ -97,23 +229,48 @@ class TransformersLLMClient(LLMClient):
         }
         if generation_kwargs:
             self._defaults.update(generation_kwargs)
+        # Batched generation pads prompts; decoder-only models need left padding.
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+        self._tokenizer.padding_side = "left"
 
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        call_kwargs = self._call_kwargs(kwargs)
+        outputs = self._pipeline(self._messages(prompt), **call_kwargs)
+        text = self._postprocess_text(self._extract_text(outputs))
+        return LLMResponse(text=text, raw={"outputs": outputs})
+
+    def complete_batch(self, prompts: Sequence[str], **kwargs: Any) -> List[LLMResponse]:
+        """Generate all prompts in a single batched pipeline call."""
+        if not prompts:
+            return []
+        call_kwargs = self._call_kwargs(kwargs)
+        call_kwargs.setdefault("batch_size", len(prompts))
+        batch_outputs = self._pipeline(
+            [self._messages(prompt) for prompt in prompts], **call_kwargs
+        )
+        return [
+            LLMResponse(
+                text=self._postprocess_text(self._extract_text(outputs)),
+                raw={"outputs": outputs},
+            )
+            for outputs in batch_outputs
+        ]
+
+    def _call_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
         call_kwargs = dict(self._defaults)
         kwargs = dict(kwargs)
         kwargs.pop("refinement_round", None)
         call_kwargs.update(kwargs)
+        return call_kwargs
 
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
         # Build chat-formatted messages to leverage harmony template.
-        messages = [
+        return [
             {"role": "system", "content": self._system_prompt},
             {"role": "user", "content": prompt},
         ]
 
-        outputs = self._pipeline(messages, **call_kwargs)
-        text = self._postprocess_text(self._extract_text(outputs))
-        return LLMResponse(text=text, raw={"outputs": outputs})
-
     def _extract_text(self, outputs: Any) -> str:
         """Normalize pipeline outputs into a single string response."""
         if not outputs:
@@ -167,9 +324,9 @@ class TransformersLLMClient(LLMClient):
                 candidate = trimmed[start: end + 1].strip()
                 candidate_clean = candidate.replace("\r", " ").replace("\n", " ")
                 try:
-                    json.loads(candidate_clean)
+                    _json.loads(candidate_clean)
                     return candidate_clean
-                except json.JSONDecodeError:
+                except _json.JSONDecodeError:
                     pass
 
         return trimmed.replace("\r", " ").replace("\n", " ")
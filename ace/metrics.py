@@ -1,20 +1,117 @@
 """Evaluation metrics for PATENTMATCH and other classification tasks."""
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import array
 import math
+import sys
+
+import numpy as np
+
+from ._metrics_kernel import class_counts
+
+
+# Positive class for the PATENTMATCH label sets; anything else falls back to
+# _select_positive_class.
+_POSITIVE_CLASS_LUT: Dict[FrozenSet[str], str] = {
+    frozenset({"X", "A"}): "X",
+    frozenset({"X"}): "X",
+    frozenset({"A"}): "A",
+}
+
+
+def _select_positive_class(unique_classes: List[str]) -> str:
+    """Pick the positive class from the sorted set of ground truth labels."""
+    # For binary classification, we treat the first unique class as positive
+    # In PATENTMATCH context, "X" is typically the positive class (novelty-breaking)
+    if len(unique_classes) >= 2:
+        positive_class = unique_classes[0]  # Will be "A" if both A and X present
+        # But for PATENTMATCH, X is the positive class, so we prioritize it
+        if "X" in unique_classes:
+            positive_class = "X"
+        elif len(unique_classes) == 2:
+            positive_class = unique_classes[1]
+    elif len(unique_classes) == 1:
+        positive_class = unique_classes[0]
+    else:
+        positive_class = "X"
+    return positive_class
+
+
+# Next wider array typecode and the largest code the current one can hold
+_WIDER_CODES: Dict[str, Tuple[str, int]] = {"b": ("h", 127), "h": ("i", 32767)}
+
+
+def _codes(column: array.array) -> np.ndarray:
+    """View a code column as a NumPy array of the matching integer width."""
+    return np.frombuffer(column, dtype=column.typecode)
+
+
+def _as_list(values: Iterable[Any]) -> List[Any]:
+    """Return array-like input as a list of plain Python values."""
+    if isinstance(values, np.ndarray):
+        # tolist() turns numpy.str_ / numpy.float32 into str / float
+        return values.tolist()
+    return list(values)
+
+
+def _add_counts(counts: List[int], increments: np.ndarray) -> List[int]:
+    """Return ``counts`` with per-class ``increments`` added element-wise."""
+    return [count + step for count, step in zip(counts, increments.tolist())]
 
 
 class MetricsCalculator:
     """Calculate classification metrics including accuracy, precision, recall, F1, and perplexity."""
 
     def __init__(self) -> None:
+        # Classes are encoded as small integer codes on ingest; predictions,
+        # labels and probabilities live in parallel contiguous columns. Code
+        # columns start as int8 and widen once more classes show up.
+        self._label_codes: Dict[str, int] = {}
+        self._classes: List[str] = []
+        self._unique_labels: Set[int] = set()  # Codes seen as ground truth
+        self._preds = array.array("b")
+        self._labels = array.array("b")
+        self._probs = array.array("f")
         self.reset()
 
     def reset(self) -> None:
-        """Reset all tracked predictions and labels."""
-        self.predictions: List[str] = []
-        self.labels: List[str] = []
-        self.probabilities: List[float] = []
+        """Reset all tracked predictions and labels, clearing buffers in place."""
+        self._label_codes.clear()
+        self._classes.clear()
+        self._unique_labels.clear()
+        if self._preds.typecode == "b":
+            del self._preds[:]
+            del self._labels[:]
+        else:
+            self._preds = array.array("b")
+            self._labels = array.array("b")
+        del self._probs[:]
+        self._n_probs = 0
+        # Running totals so compute() does not rescan the whole history.
+        self._correct = 0
+        self._loglik = 0.0
+        self._loglik_upto = 0
+        # Per-class counters indexed by class code; TP/FP/FN for any positive
+        # class follow from these without a rescan.
+        self._true_positives: List[int] = []
+        self._predicted: List[int] = []
+        self._actual: List[int] = []
+        self._positive_code: Optional[int] = None
+
+    @property
+    def predictions(self) -> List[str]:
+        """Tracked predictions, decoded back to class labels."""
+        return [self._classes[code] for code in self._preds]
+
+    @property
+    def labels(self) -> List[str]:
+        """Tracked ground truth labels, decoded back to class labels."""
+        return [self._classes[code] for code in self._labels]
+
+    @property
+    def probabilities(self) -> List[float]:
+        """Probabilities that were supplied alongside predictions."""
+        return [prob for prob in self._probs if not math.isnan(prob)]
 
     def add(
         self,
@@ -30,10 +127,81 @@ class MetricsCalculator:
             label: The ground truth class
             probability: Optional probability/confidence score for the prediction
         """
-        self.predictions.append(prediction)
-        self.labels.append(label)
+        # Convert before touching any column so a bad value leaves no partial row
+        prob = math.nan if probability is None else float(probability)
+        pred_code = self._encode(prediction)
+        label_code = self._encode(label)
+        self._preds.append(pred_code)
+        self._labels.append(label_code)
+        if label_code not in self._unique_labels:
+            self._unique_labels.add(label_code)
+            self._positive_code = None
+
+        self._predicted[pred_code] += 1
+        self._actual[label_code] += 1
+        if pred_code == label_code:
+            self._correct += 1
+            self._true_positives[pred_code] += 1
+
+        self._probs.append(prob)
         if probability is not None:
-            self.probabilities.append(probability)
+            self._n_probs += 1
+
+    def add_batch(
+        self,
+        predictions: Iterable[str],
+        labels: Iterable[str],
+        probabilities: Optional[Iterable[Optional[float]]] = None,
+    ) -> None:
+        """
+        Add many prediction-label pairs at once.
+
+        Args:
+            predictions: The predicted classes; any sequence or NumPy array
+            labels: The ground truth classes, aligned with ``predictions``
+            probabilities: Optional probabilities aligned with ``predictions``;
+                ``None`` entries mark samples without a probability
+        """
+        predictions = _as_list(predictions)
+        labels = _as_list(labels)
+        if len(predictions) != len(labels):
+            raise ValueError("predictions and labels must have the same length.")
+        if probabilities is None:
+            probs = array.array("f", [math.nan]) * len(predictions)
+            n_probs = 0
+        else:
+            probabilities = _as_list(probabilities)
+            if len(probabilities) != len(predictions):
+                raise ValueError("probabilities must align with predictions.")
+            # Convert everything before touching any column or counter, so a
+            # bad value cannot leave the calculator half-updated
+            probs = array.array(
+                "f", [math.nan if prob is None else float(prob) for prob in probabilities]
+            )
+            n_probs = sum(prob is not None for prob in probabilities)
+
+        pred_codes = [self._encode(prediction) for prediction in predictions]
+        label_codes = [self._encode(label) for label in labels]
+        start = len(self._preds)
+        self._preds.extend(pred_codes)
+        self._labels.extend(label_codes)
+        new_labels = set(label_codes) - self._unique_labels
+        if new_labels:
+            self._unique_labels.update(new_labels)
+            self._positive_code = None
+
+        self._probs.extend(probs)
+        self._n_probs += n_probs
+
+        true_positives, predicted, actual = class_counts(
+            _codes(self._labels)[start:],
+            _codes(self._preds)[start:],
+            len(self._classes),
+        )
+        self._correct += int(true_positives.sum())
+        self._true_positives = _add_counts(self._true_positives, true_positives)
+        self._predicted = _add_counts(self._predicted, predicted)
+        self._actual = _add_counts(self._actual, actual)
 
     def compute(self) -> Dict[str, float]:
         """
@@ -42,7 +210,8 @@ class MetricsCalculator:
         Returns:
             Dictionary containing accuracy, precision, recall, f1, and perplexity
         """
-        if not self.predictions or not self.labels:
+        n = len(self._preds)
+        if not n:
             return {
                 "accuracy": 0.0,
                 "precision": 0.0,
@@ -54,96 +223,94 @@ class MetricsCalculator:
         metrics = {}
 
         # Accuracy
-        correct = sum(1 for p, l in zip(self.predictions, self.labels) if p == l)
-        metrics["accuracy"] = correct / len(self.predictions)
-
-        # For binary classification, we treat the first unique class as positive
-        # In PATENTMATCH context, "X" is typically the positive class (novelty-breaking)
-        unique_classes = sorted(set(self.labels))
-        if len(unique_classes) >= 2:
-            positive_class = unique_classes[0]  # Will be "A" if both A and X present
-            # But for PATENTMATCH, X is the positive class, so we prioritize it
-            if "X" in unique_classes:
-                positive_class = "X"
-            elif len(unique_classes) == 2:
-                positive_class = unique_classes[1]
-        elif len(unique_classes) == 1:
-            positive_class = unique_classes[0]
-        else:
-            positive_class = "X"
-
-        # Calculate TP, FP, TN, FN
-        tp = sum(
-            1
-            for p, l in zip(self.predictions, self.labels)
-            if p == positive_class and l == positive_class
-        )
-        fp = sum(
-            1
-            for p, l in zip(self.predictions, self.labels)
-            if p == positive_class and l != positive_class
-        )
-        fn = sum(
-            1
-            for p, l in zip(self.predictions, self.labels)
-            if p != positive_class and l == positive_class
-        )
-        tn = sum(
-            1
-            for p, l in zip(self.predictions, self.labels)
-            if p != positive_class and l != positive_class
-        )
-
-        # Precision
-        metrics["precision"] = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-
-        # Recall
-        metrics["recall"] = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+        metrics["accuracy"] = self._correct / n
 
-        # F1 Score
-        if metrics["precision"] + metrics["recall"] > 0:
-            metrics["f1"] = (
-                2
-                * metrics["precision"]
-                * metrics["recall"]
-                / (metrics["precision"] + metrics["recall"])
-            )
+        # Per-class counters are kept up to date on ingest, so a change of
+        # positive class (e.g. the first "X" label arrives) needs no rescan.
+        positive_code = self._positive_code_cached()
+        if positive_code < 0:
+            tp = fp = fn = 0
         else:
-            metrics["f1"] = 0.0
+            tp = self._true_positives[positive_code]
+            fp = self._predicted[positive_code] - tp
+            fn = self._actual[positive_code] - tp
 
-        # Perplexity (requires probabilities)
-        if self.probabilities and len(self.probabilities) == len(self.predictions):
-            log_likelihood = 0.0
-            for prob, pred, label in zip(
-                self.probabilities, self.predictions, self.labels
-            ):
-                # Use the probability as confidence for correct predictions
-                # For incorrect predictions, use 1 - probability
-                if pred == label:
-                    # Correct prediction
-                    actual_prob = max(prob, 1e-10)  # Avoid log(0)
-                else:
-                    # Incorrect prediction
-                    actual_prob = max(1.0 - prob, 1e-10)  # Avoid log(0)
-
-                log_likelihood += math.log(actual_prob)
+        # Precision, recall and F1 are derived from locals, not read back from the dict
+        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+        denominator = precision + recall
+        f1 = 2 * precision * recall / denominator if denominator > 0 else 0.0
+        metrics["precision"] = precision
+        metrics["recall"] = recall
+        metrics["f1"] = f1
 
+        # Perplexity (requires probabilities)
+        if self._n_probs == n:
             # Perplexity is exp of average negative log likelihood
-            avg_neg_log_likelihood = -log_likelihood / len(self.probabilities)
+            avg_neg_log_likelihood = -self._log_likelihood() / n
             metrics["perplexity"] = math.exp(avg_neg_log_likelihood)
         else:
             # If no probabilities provided, estimate from accuracy
             # Higher accuracy -> lower perplexity
             if metrics["accuracy"] > 0:
-                # Approximate perplexity from error rate
-                error_rate = 1.0 - metrics["accuracy"]
-                # Add smoothing to avoid log(0)
-                metrics["perplexity"] = math.exp(-math.log(max(metrics["accuracy"], 0.01)))
+                # exp(-log(acc)) == 1 / acc; smoothing keeps it bounded
+                metrics["perplexity"] = 1.0 / max(metrics["accuracy"], 0.01)
             else:
                 metrics["perplexity"] = float("inf")
 
         return metrics
 
+    def _log_likelihood(self) -> float:
+        """Return the total log-likelihood, folding in samples added since the last call."""
+        start = self._loglik_upto
+        if start < len(self._probs):
+            probs = np.frombuffer(self._probs, dtype=np.float32)[start:]
+            preds = _codes(self._preds)[start:]
+            labels = _codes(self._labels)[start:]
+            # Use the probability as confidence for correct predictions
+            # For incorrect predictions, use 1 - probability
+            actual = np.where(preds == labels, probs, 1.0 - probs)
+            # Avoid log(0) and keep out-of-range confidences from pushing perplexity below 1
+            np.clip(actual, 1e-10, 1.0, out=actual)
+            self._loglik += float(np.log(actual).sum(dtype=np.float64))
+            self._loglik_upto = len(self._probs)
+        return self._loglik
+
+    def _positive_code_cached(self) -> int:
+        """Return the positive class code, resolving it only when the label set changed."""
+        if self._positive_code is not None:
+            return self._positive_code
+
+        unique_classes = frozenset(self._classes[code] for code in self._unique_labels)
+        positive_class = _POSITIVE_CLASS_LUT.get(unique_classes)
+        if positive_class is None:
+            positive_class = _select_positive_class(sorted(unique_classes))
+
+        self._positive_code = self._label_codes.get(positive_class, -1)
+        return self._positive_code
+
+    def _encode(self, value: str) -> int:
+        """Return the integer code for a class label, assigning a new one if needed."""
+        code = self._label_codes.get(value)
+        if code is None:
+            code = len(self._classes)
+            wider = _WIDER_CODES.get(self._preds.typecode)
+            if wider is not None and code > wider[1]:
+                # Free-form predictions can add many classes; widen the
+                # code columns instead of capping the class count.
+                self._preds = array.array(wider[0], self._preds)
+                self._labels = array.array(wider[0], self._labels)
+            # Interned so lookups with literal labels hit the identity fast path;
+            # other hashable labels (ints, str subclasses) are stored as given
+            if type(value) is str:
+                value = sys.intern(value)
+            self._label_codes[value] = code
+            self._classes.append(value)
+            self._true_positives.append(0)
+            self._predicted.append(0)
+            self._actual.append(0)
+        return code
+
     def compute_aggregate(self, step_results: List[Dict[str, float]]) -> Dict[str, float]:
         """
         Compute aggregate statistics from multiple step results.
@@ -161,13 +328,13 @@ class MetricsCalculator:
         aggregates = {}
 
         for key in metrics_keys:
-            values = [r[key] for r in step_results if key in r and not math.isinf(r[key])]
-            if values:
-                mean = sum(values) / len(values)
-                variance = sum((v - mean) ** 2 for v in values) / len(values)
-                std = math.sqrt(variance)
-                aggregates[f"{key}_mean"] = mean
-                aggregates[f"{key}_std"] = std
+            values = np.asarray(
+                [r[key] for r in step_results if key in r], dtype=np.float64
+            )
+            values = values[np.isfinite(values)]
+            if values.size:
+                aggregates[f"{key}_mean"] = float(values.mean())
+                aggregates[f"{key}_std"] = float(values.std())
             else:
                 aggregates[f"{key}_mean"] = 0.0
                 aggregates[f"{key}_std"] = 0.0
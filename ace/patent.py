@@ -2,15 +2,45 @@
 
 from __future__ import annotations
 
+import math
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import ClassVar, Dict, List, Optional, Sequence, Tuple
 
 from .adaptation import Sample, TaskEnvironment, EnvironmentResult
 from .metrics import MetricsCalculator
 from .roles import GeneratorOutput
 
 
-@dataclass
+_VALID_LABELS = frozenset({"X", "A"})
+
+
+# Feedback for every valid (prediction, correct) outcome, built once at import
+_FEEDBACK: Dict[Tuple[str, bool], str] = {
+    ("X", True): "Correct: The paragraph does break novelty (X classification)",
+    ("A", True): "Correct: The paragraph does not break novelty (A classification)",
+    ("X", False): (
+        "Incorrect: Classified as X (match) but should be A (no match). "
+        "The paragraph does not contain all key features of the claim."
+    ),
+    ("A", False): (
+        "Incorrect: Classified as A (no match) but should be X (match). "
+        "The paragraph actually describes the same invention and breaks novelty."
+    ),
+}
+
+
+def _invalid_result(prediction: str, ground_truth: str) -> EnvironmentResult:
+    """Return the result for a prediction that is neither X nor A."""
+    feedback = f"Invalid classification '{prediction}'. Must be 'X' (match) or 'A' (no match)."
+    return EnvironmentResult(
+        feedback=feedback,
+        ground_truth=ground_truth,
+        metrics={"accuracy": 0.0, "error": 1.0},
+    )
+
+
+@dataclass(slots=True)
 class PatentSample(Sample):
     """
     Sample for PATENTMATCH task containing a claim-paragraph pair.
@@ -27,15 +57,47 @@ class PatentSample(Sample):
     paragraph: str = ""
     question: str = ""  # Make question optional for PatentSample
 
+    # Set to True on large corpora where claims and paragraphs repeat
+    intern_text: ClassVar[bool] = False
+
     def __post_init__(self):
-        """Set the question field to maintain compatibility with base Sample."""
+        """Normalize the label and defer building the question until first read."""
+        # Labels and domain contexts repeat across the whole dataset
+        if self.ground_truth is not None:
+            self.ground_truth = sys.intern(self.ground_truth.strip().upper())
+        if type(self.context) is str:
+            self.context = sys.intern(self.context)
+        if self.intern_text:
+            if type(self.claim) is str:
+                self.claim = sys.intern(self.claim)
+            if type(self.paragraph) is str:
+                self.paragraph = sys.intern(self.paragraph)
+        if not self.question:
+            # Leave the slot unset so __getattr__ fills it in on first access
+            del self.question
+
+    def __getattr__(self, name: str) -> str:
+        """Build the question from the claim and paragraph when it is first read."""
+        if name != "question":
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
         # For compatibility with base ACE framework, we use 'question' field
         # In PATENTMATCH, the "question" is implicit: "Does this match?"
-        if not self.question:
-            self.question = f"Claim: {self.claim}\n\nParagraph: {self.paragraph}"
+        question = f"Claim: {self.claim}\n\nParagraph: {self.paragraph}"
+        self.question = question
+        return question
+
+
+def _ground_truth(sample: Sample) -> str:
+    """Return the sample's ground truth normalized to an upper-case label."""
+    if type(sample) is PatentSample:
+        return sample.ground_truth or ""
+    # Other samples are not normalized on construction
+    return (sample.ground_truth or "").strip().upper()
 
 
-@dataclass
+@dataclass(slots=True)
 class PatentEnvironmentResult(EnvironmentResult):
     """
     Extended environment result for PATENTMATCH with additional metrics.
@@ -57,7 +119,8 @@ class PatentMatchEnvironment(TaskEnvironment):
 
     def __init__(self) -> None:
         self.metrics_calculator = MetricsCalculator()
-        self.step_metrics: list[Dict[str, float]] = []
+        # Welford accumulators (count, mean, M2) per metric across steps
+        self._running_stats: Dict[str, Tuple[int, float, float]] = {}
 
     def evaluate(
         self, sample: Sample, generator_output: GeneratorOutput
@@ -72,63 +135,25 @@ class PatentMatchEnvironment(TaskEnvironment):
         Returns:
             EnvironmentResult with feedback and metrics
         """
-        if not isinstance(sample, PatentSample):
-            # Try to convert if it's a regular Sample
-            sample = PatentSample(
-                claim=sample.metadata.get("claim", ""),
-                paragraph=sample.metadata.get("paragraph", ""),
-                ground_truth=sample.ground_truth,
-                context=sample.context,
-                metadata=sample.metadata,
-            )
-
-        ground_truth = (sample.ground_truth or "").strip().upper()
+        ground_truth = _ground_truth(sample)
         prediction = generator_output.final_answer.strip().upper()
 
-        # Extract probability if available in the raw output
-        probability = None
-        if "confidence" in generator_output.raw:
-            probability = float(generator_output.raw["confidence"])
-        elif "probability" in generator_output.raw:
-            probability = float(generator_output.raw["probability"])
+        probability = generator_output.probability
 
         # Validate classification
-        valid_labels = {"X", "A"}
-        if prediction not in valid_labels:
-            feedback = f"Invalid classification '{prediction}'. Must be 'X' (match) or 'A' (no match)."
-            return EnvironmentResult(
-                feedback=feedback,
-                ground_truth=ground_truth,
-                metrics={"accuracy": 0.0, "error": 1.0},
-            )
+        if prediction not in _VALID_LABELS:
+            return _invalid_result(prediction, ground_truth)
 
-        # Check correctness
+        # Check correctness and build detailed feedback
         correct = prediction == ground_truth
-
-        # Build detailed feedback
-        if correct:
-            if prediction == "X":
-                feedback = "Correct: The paragraph does break novelty (X classification)"
-            else:
-                feedback = "Correct: The paragraph does not break novelty (A classification)"
-        else:
-            if prediction == "X":
-                feedback = (
-                    f"Incorrect: Classified as X (match) but should be A (no match). "
-                    f"The paragraph does not contain all key features of the claim."
-                )
-            else:
-                feedback = (
-                    f"Incorrect: Classified as A (no match) but should be X (match). "
-                    f"The paragraph actually describes the same invention and breaks novelty."
-                )
+        feedback = _FEEDBACK[prediction, correct]
 
         # Update metrics
         self.metrics_calculator.add(prediction, ground_truth, probability)
 
         # Compute current metrics
         current_metrics = self.metrics_calculator.compute()
-        self.step_metrics.append(current_metrics)
+        self._update_running_stats(current_metrics)
 
         return PatentEnvironmentResult(
             feedback=feedback,
@@ -138,6 +163,64 @@ class PatentMatchEnvironment(TaskEnvironment):
             probability=probability,
         )
 
+    def evaluate_batch(
+        self,
+        samples: Sequence[Sample],
+        generator_outputs: Sequence[GeneratorOutput],
+    ) -> List[EnvironmentResult]:
+        """
+        Evaluate many classification decisions with a single metrics update.
+
+        Valid predictions are added to the metrics calculator in one
+        ``add_batch`` call and share the metrics computed after the whole
+        batch, which also count as a single step in the aggregate metrics.
+        Invalid predictions get the same error result as ``evaluate``.
+
+        Args:
+            samples: PatentSamples with claim, paragraph, and ground truth
+            generator_outputs: Generator outputs aligned with ``samples``
+
+        Returns:
+            One EnvironmentResult per sample, in input order
+        """
+        if len(samples) != len(generator_outputs):
+            raise ValueError("samples and generator_outputs must have the same length.")
+
+        results: List[Optional[EnvironmentResult]] = [None] * len(samples)
+        valid: List[int] = []
+        predictions: List[str] = []
+        ground_truths: List[str] = []
+        probabilities: List[Optional[float]] = []
+        for index, (sample, generator_output) in enumerate(zip(samples, generator_outputs)):
+            ground_truth = _ground_truth(sample)
+            prediction = generator_output.final_answer.strip().upper()
+            if prediction not in _VALID_LABELS:
+                results[index] = _invalid_result(prediction, ground_truth)
+                continue
+            valid.append(index)
+            predictions.append(prediction)
+            ground_truths.append(ground_truth)
+            probabilities.append(generator_output.probability)
+
+        if not valid:
+            return results
+
+        self.metrics_calculator.add_batch(predictions, ground_truths, probabilities)
+        current_metrics = self.metrics_calculator.compute()
+        self._update_running_stats(current_metrics)
+
+        for index, prediction, ground_truth, probability in zip(
+            valid, predictions, ground_truths, probabilities
+        ):
+            results[index] = PatentEnvironmentResult(
+                feedback=_FEEDBACK[prediction, prediction == ground_truth],
+                ground_truth=ground_truth,
+                metrics=dict(current_metrics),
+                prediction=prediction,
+                probability=probability,
+            )
+        return results
+
     def get_aggregate_metrics(self) -> Dict[str, float]:
         """
         Get aggregate metrics across all evaluated samples.
@@ -145,9 +228,24 @@ class PatentMatchEnvironment(TaskEnvironment):
         Returns:
             Dictionary with mean and std for each metric
         """
-        return self.metrics_calculator.compute_aggregate(self.step_metrics)
+        aggregates: Dict[str, float] = {}
+        for key, (count, mean, m2) in self._running_stats.items():
+            aggregates[f"{key}_mean"] = mean
+            aggregates[f"{key}_std"] = math.sqrt(m2 / count) if count else 0.0
+        return aggregates
 
     def reset_metrics(self) -> None:
         """Reset all accumulated metrics."""
         self.metrics_calculator.reset()
-        self.step_metrics = []
+        self._running_stats = {}
+
+    def _update_running_stats(self, metrics: Dict[str, float]) -> None:
+        """Fold one step's metrics into the running mean/variance accumulators."""
+        for key, value in metrics.items():
+            count, mean, m2 = self._running_stats.get(key, (0, 0.0, 0.0))
+            if math.isfinite(value):
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+            self._running_stats[key] = (count, mean, m2)
@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .delta import DeltaBatch, DeltaOperation
 from .deduplication import Deduplicator
@@ -47,6 +47,8 @@ class Playbook:
     def __init__(self) -> None:
         self._bullets: Dict[str, Bullet] = {}
         self._sections: Dict[str, List[str]] = {}
+        # (content, content.lower()) per bullet id, memoized by search()
+        self._content_lower: Dict[str, Tuple[str, str]] = {}
         self._next_id = 0
 
     # ------------------------------------------------------------------ #
@@ -95,6 +97,7 @@ class Playbook:
         bullet = self._bullets.pop(bullet_id, None)
         if bullet is None:
             return
+        self._content_lower.pop(bullet_id, None)
         section_list = self._sections.get(bullet.section)
         if section_list:
             self._sections[bullet.section] = [
@@ -109,6 +112,35 @@ class Playbook:
     def bullets(self) -> List[Bullet]:
         return list(self._bullets.values())
 
+    def search(self, text: str) -> List[Bullet]:
+        """Return the bullets whose content contains ``text``, ignoring case."""
+        needle = text.lower()
+        matches: List[Bullet] = []
+        for bullet_id, bullet in self._bullets.items():
+            content = bullet.content
+            cached = self._content_lower.get(bullet_id)
+            # Bullets are handed out as live objects, so re-lower whenever the
+            # content was replaced, however it was changed.
+            if cached is None or cached[0] is not content:
+                cached = (content, content.lower())
+                self._content_lower[bullet_id] = cached
+            if needle in cached[1]:
+                matches.append(bullet)
+        return matches
+
+    def copy(self) -> "Playbook":
+        """Return an independent copy of the playbook."""
+        instance = type(self)()
+        instance._bullets = {
+            bullet_id: replace(bullet) for bullet_id, bullet in self._bullets.items()
+        }
+        instance._sections = {
+            section: list(ids) for section, ids in self._sections.items()
+        }
+        instance._content_lower = dict(self._content_lower)
+        instance._next_id = self._next_id
+        return instance
+
     # ------------------------------------------------------------------ #
     # Serialization
     # ------------------------------------------------------------------ #
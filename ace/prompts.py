@@ -1,5 +1,9 @@
 """Prompt templates adapted from the ACE paper for reuse."""
 
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, Dict, List, Mapping
+
 GENERATOR_PROMPT = """\
 You are an expert assistant that must solve the task using the provided playbook of strategies.
 Apply relevant bullets, avoid known mistakes, and show step-by-step reasoning.
@@ -87,3 +91,70 @@ Respond with JSON:
 }}
 If no updates are required, return an empty list for "operations".
 """
+
+
+def compile_template(
+    template: str, *, cache_size: int = 0
+) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Compile a ``str.format`` template into a renderer function.
+
+    The template is parsed once and turned into a generated function whose
+    body is a single f-string, so rendering is straight-line code instead of
+    re-parsing the template on each call. The renderer takes a mapping of
+    field values and returns the same text as ``template.format(**fields)``.
+    Only named fields are supported.
+
+    With ``cache_size > 0`` the renderer memoizes its output in an LRU cache
+    keyed on the field items, so replaying identical inputs skips rendering.
+    Mappings with unhashable values are rendered without the cache.
+    """
+    pieces: List[str] = []
+    namespace: Dict[str, Any] = {}
+    for literal, field_name, format_spec, conversion in Formatter().parse(template):
+        if literal:
+            # Plain literals next to an f-string are not scanned for braces
+            pieces.append(repr(literal))
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or "{" in (format_spec or ""):
+            raise ValueError(f"Unsupported prompt template field: {{{field_name}}}")
+        expression = f"fields[{field_name!r}]"
+        if conversion:
+            expression += f"!{conversion}"
+        if format_spec:
+            spec_name = f"_spec{len(namespace)}"
+            namespace[spec_name] = format_spec
+            expression += f":{{{spec_name}}}"
+        pieces.append(f'f"{{{expression}}}"')
+
+    body = " ".join(pieces) if pieces else '""'
+    exec(f"def render(fields):\n    return ({body})\n", namespace)
+    render = namespace["render"]
+    if cache_size <= 0:
+        return render
+    return _CachedRenderer(render, cache_size)
+
+
+class _CachedRenderer:
+    """Renderer wrapper that memoizes output for repeated field values."""
+
+    def __init__(self, render: Callable[[Mapping[str, Any]], str], maxsize: int) -> None:
+        self._render = render
+        self._render_items = lru_cache(maxsize=maxsize)(self._render_from_items)
+
+    def __call__(self, fields: Mapping[str, Any]) -> str:
+        # The value's type is part of the key: 1, 1.0 and True hash and
+        # compare equal but can format differently.
+        key = tuple((name, type(value), value) for name, value in fields.items())
+        try:
+            return self._render_items(key)
+        except TypeError:
+            return self._render(fields)
+
+    def cache_info(self):
+        """Return the ``functools.lru_cache`` statistics for this renderer."""
+        return self._render_items.cache_info()
+
+    def _render_from_items(self, key: tuple) -> str:
+        return self._render({name: value for name, _, value in key})
@@ -7,16 +7,22 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
+from . import _json
 from .delta import DeltaBatch
 from .llm import LLMClient
 from .playbook import Playbook
-from .prompts import CURATOR_PROMPT, GENERATOR_PROMPT, REFLECTOR_PROMPT
+from .prompts import (
+    CURATOR_PROMPT,
+    GENERATOR_PROMPT,
+    REFLECTOR_PROMPT,
+    compile_template,
+)
 
 
 def _safe_json_loads(text: str) -> Dict[str, Any]:
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError as exc:
+        data = _json.loads(text)
+    except _json.JSONDecodeError as exc:
         debug_path = Path("logs/json_failures.log")
         debug_path.parent.mkdir(parents=True, exist_ok=True)
         with debug_path.open("a", encoding="utf-8") as fh:
@@ -33,12 +39,30 @@ def _format_optional(value: Optional[str]) -> str:
     return value or "(none)"
 
 
-@dataclass
+def _extract_probability(data: Dict[str, Any]) -> Optional[float]:
+    value = data.get("confidence")
+    if value is None:
+        value = data.get("probability")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
 class GeneratorOutput:
     reasoning: str
     final_answer: str
     bullet_ids: List[str]
     raw: Dict[str, Any]
+    probability: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        # Parse the model's confidence once instead of in every consumer
+        if self.probability is None:
+            self.probability = _extract_probability(self.raw)
 
 
 class Generator:
@@ -50,10 +74,16 @@ class Generator:
         prompt_template: str = GENERATOR_PROMPT,
         *,
         max_retries: int = 3,
+        prompt_cache_size: int = 0,
     ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
         self.max_retries = max_retries
+        # Opt-in for replay/evaluation runs that render identical prompts;
+        # adapter prompts embed the evolving playbook and rarely repeat.
+        self._render_prompt = compile_template(
+            prompt_template, cache_size=prompt_cache_size
+        )
 
     def generate(
         self,
@@ -78,7 +108,7 @@ class Generator:
         if "paragraph" in kwargs:
             format_dict["paragraph"] = kwargs.pop("paragraph")
         
-        base_prompt = self.prompt_template.format(**format_dict)
+        base_prompt = self._render_prompt(format_dict)
         prompt = base_prompt
         last_error: Optional[Exception] = None
         for attempt in range(self.max_retries):
@@ -136,10 +166,16 @@ class Reflector:
         prompt_template: str = REFLECTOR_PROMPT,
         *,
         max_retries: int = 3,
+        prompt_cache_size: int = 0,
     ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
         self.max_retries = max_retries
+        # Opt-in for replay/evaluation runs that render identical prompts;
+        # adapter prompts embed the evolving playbook and rarely repeat.
+        self._render_prompt = compile_template(
+            prompt_template, cache_size=prompt_cache_size
+        )
 
     def reflect(
         self,
@@ -170,7 +206,7 @@ class Reflector:
         if "paragraph" in kwargs:
             format_dict["paragraph"] = kwargs.pop("paragraph")
         
-        base_prompt = self.prompt_template.format(**format_dict)
+        base_prompt = self._render_prompt(format_dict)
         result: Optional[ReflectorOutput] = None
         prompt = base_prompt
         last_error: Optional[Exception] = None
@@ -235,10 +271,16 @@ class Curator:
         prompt_template: str = CURATOR_PROMPT,
         *,
         max_retries: int = 3,
+        prompt_cache_size: int = 0,
     ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
         self.max_retries = max_retries
+        # Opt-in for replay/evaluation runs that render identical prompts;
+        # adapter prompts embed the evolving playbook and rarely repeat.
+        self._render_prompt = compile_template(
+            prompt_template, cache_size=prompt_cache_size
+        )
 
     def curate(
         self,
@@ -249,12 +291,14 @@ class Curator:
         progress: str,
         **kwargs: Any,
     ) -> CuratorOutput:
-        base_prompt = self.prompt_template.format(
-            progress=progress,
-            stats=json.dumps(playbook.stats()),
-            reflection=json.dumps(reflection.raw, ensure_ascii=False, indent=2),
-            playbook=playbook.as_prompt() or "(empty playbook)",
-            question_context=question_context,
+        base_prompt = self._render_prompt(
+            {
+                "progress": progress,
+                "stats": json.dumps(playbook.stats()),
+                "reflection": json.dumps(reflection.raw, ensure_ascii=False, indent=2),
+                "playbook": playbook.as_prompt() or "(empty playbook)",
+                "question_context": question_context,
+            }
         )
         prompt = base_prompt
         last_error: Optional[Exception] = None
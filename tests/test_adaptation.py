@@ -1,7 +1,9 @@
 import json
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 from ace import (
+    BatchingLLMClient,
     DummyLLMClient,
     EnvironmentResult,
     OfflineAdapter,
@@ -11,7 +13,9 @@ from ace import (
     Generator,
     Reflector,
     Curator,
+    LLMClient,
 )
+from ace.llm import LLMResponse
 
 
 class SimpleQAEnvironment(TaskEnvironment):
@@ -27,6 +31,24 @@ class SimpleQAEnvironment(TaskEnvironment):
         )
 
 
+class RoleRoutingLLMClient(LLMClient):
+    """Answers each role by prompt so responses do not depend on call order."""
+
+    def complete(self, prompt: str, **kwargs) -> LLMResponse:
+        if prompt.startswith("You are the curator"):
+            payload = {
+                "reasoning": "Record the default answer.",
+                "operations": [
+                    {"type": "ADD", "section": "default_answers", "content": "Answer 42."}
+                ],
+            }
+        elif prompt.startswith("You are a senior reviewer"):
+            payload = {"reasoning": "Correct.", "key_insight": "42", "bullet_tags": []}
+        else:
+            payload = {"reasoning": "Known answer.", "bullet_ids": [], "final_answer": "42"}
+        return LLMResponse(text=json.dumps(payload))
+
+
 class OfflineAdapterTest(unittest.TestCase):
     def test_single_step_updates_playbook(self) -> None:
         client = DummyLLMClient()
@@ -95,6 +117,104 @@ class OfflineAdapterTest(unittest.TestCase):
             any("life" in bullet.content for bullet in playbook.bullets())
         )
 
+    def test_parallel_run_preserves_sample_order(self) -> None:
+        client = RoleRoutingLLMClient()
+        playbook = Playbook()
+        adapter = OfflineAdapter(
+            playbook=playbook,
+            generator=Generator(client),
+            reflector=Reflector(client),
+            curator=Curator(client),
+            max_workers=4,
+        )
+
+        samples = [
+            Sample(question=f"Question {index}?", ground_truth="42")
+            for index in range(8)
+        ]
+        results = adapter.run(samples, SimpleQAEnvironment(), epochs=2)
+
+        self.assertEqual(len(results), 16)
+        self.assertEqual([result.sample for result in results], samples * 2)
+        self.assertEqual(playbook.stats()["bullets"], 16)
+
+    def test_batching_client_coalesces_parallel_calls(self) -> None:
+        batch_sizes = []
+
+        class RecordingClient(RoleRoutingLLMClient):
+            def complete_batch(self, prompts, **kwargs):
+                batch_sizes.append(len(prompts))
+                return super().complete_batch(prompts, **kwargs)
+
+        client = BatchingLLMClient(RecordingClient(), flush_ms=50, max_batch_size=4)
+        try:
+            adapter = OfflineAdapter(
+                playbook=Playbook(),
+                generator=Generator(client),
+                reflector=Reflector(client),
+                curator=Curator(client),
+                max_workers=4,
+            )
+            samples = [
+                Sample(question=f"Question {index}?", ground_truth="42")
+                for index in range(8)
+            ]
+            results = adapter.run(samples, SimpleQAEnvironment())
+        finally:
+            client.close()
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(sum(batch_sizes), 8 * 3)
+        self.assertLessEqual(max(batch_sizes), 4)
+        self.assertGreater(max(batch_sizes), 1)
+
+    def test_batching_client_survives_failed_batch(self) -> None:
+        calls = []
+
+        class FlakyClient(RoleRoutingLLMClient):
+            def complete_batch(self, prompts, **kwargs):
+                calls.append(len(prompts))
+                if len(calls) == 1:
+                    raise ConnectionError("backend unavailable")
+                return super().complete_batch(prompts, **kwargs)
+
+        class Unequal:
+            def __eq__(self, other):
+                raise ValueError("ambiguous comparison")
+
+        client = BatchingLLMClient(FlakyClient(), flush_ms=200)
+        try:
+            with self.assertRaises(ConnectionError):
+                client.complete("question")
+            # Requests whose kwargs cannot be compared are sent separately
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(client.complete, "question", marker=Unequal())
+                    for _ in range(2)
+                ]
+                responses = [future.result(timeout=5) for future in futures]
+        finally:
+            client.close()
+        self.assertTrue(all("42" in response.text for response in responses))
+        self.assertEqual(calls, [1, 1, 1])
+
+
+class GeneratorParsingTest(unittest.TestCase):
+    def test_accepts_json_the_stdlib_parser_accepts(self) -> None:
+        client = DummyLLMClient()
+        client.queue(
+            '{"reasoning": "", "bullet_ids": [], "final_answer": "42", '
+            '"confidence": NaN, "trace_id": 123456789012345678901234567890, '
+            '"offset": -9223372036854775809}'
+        )
+        output = Generator(client).generate(
+            question="q", context=None, playbook=Playbook()
+        )
+
+        self.assertEqual(output.final_answer, "42")
+        self.assertEqual(output.raw["trace_id"], 123456789012345678901234567890)
+        self.assertEqual(output.raw["offset"], -9223372036854775809)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from ace import Playbook
+
+
+class PlaybookSearchTest(unittest.TestCase):
+    def test_search_is_case_insensitive(self) -> None:
+        playbook = Playbook()
+        first = playbook.add_bullet("defaults", "Answer 42 for Life questions.")
+        playbook.add_bullet("defaults", "Check units before answering.")
+
+        self.assertEqual(playbook.search("life"), [first])
+        self.assertEqual(playbook.search("LIFE"), [first])
+        self.assertEqual(playbook.search("missing"), [])
+
+    def test_search_tracks_updates_and_removals(self) -> None:
+        playbook = Playbook()
+        bullet = playbook.add_bullet("defaults", "Answer 42.")
+
+        playbook.update_bullet(bullet.id, content="Always cite the Claim.")
+        self.assertEqual(playbook.search("answer"), [])
+        self.assertEqual(playbook.search("claim"), [bullet])
+
+        playbook.remove_bullet(bullet.id)
+        self.assertEqual(playbook.search("claim"), [])
+
+    def test_search_sees_direct_content_edits(self) -> None:
+        playbook = Playbook()
+        bullet = playbook.add_bullet("defaults", "Answer 42.")
+        self.assertEqual(playbook.search("answer"), [bullet])
+
+        playbook.get_bullet(bullet.id).content = "Always cite the Claim."
+        self.assertEqual(playbook.search("answer"), [])
+        self.assertEqual(playbook.search("claim"), [bullet])
+
+    def test_search_after_round_trip(self) -> None:
+        playbook = Playbook()
+        playbook.add_bullet("defaults", "Compare Features one by one.")
+
+        restored = Playbook.loads(playbook.dumps())
+        self.assertEqual(len(restored.search("features")), 1)
+        self.assertEqual(len(restored.copy().search("features")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from ace.prompts import GENERATOR_PROMPT, compile_template
+
+
+class CompileTemplateTest(unittest.TestCase):
+    def test_matches_str_format(self) -> None:
+        fields = {
+            "playbook": "## defaults\n- [d-1] Answer {42}.",
+            "reflection": "(none)",
+            "question": "What is it?",
+            "context": "(none)",
+        }
+        render = compile_template(GENERATOR_PROMPT)
+        self.assertEqual(render(fields), GENERATOR_PROMPT.format(**fields))
+
+    def test_cached_renderer_reuses_output(self) -> None:
+        render = compile_template("{a} and {b:>4}", cache_size=8)
+
+        first = render({"a": "x", "b": "y"})
+        second = render({"a": "x", "b": "y"})
+        self.assertEqual(first, "x and    y")
+        self.assertIs(first, second)
+        self.assertEqual(render.cache_info().hits, 1)
+
+        # Equal values of different types are not served from each other's entry
+        self.assertEqual(render({"a": 1, "b": "y"}), "1 and    y")
+        self.assertEqual(render({"a": 1.0, "b": "y"}), "1.0 and    y")
+        self.assertEqual(render({"a": True, "b": "y"}), "True and    y")
+
+        # Unhashable values bypass the cache instead of failing
+        self.assertEqual(render({"a": ["x"], "b": "y"}), "['x'] and    y")
+
+
+if __name__ == "__main__":
+    unittest.main()